@@ -12,13 +12,14 @@
     'category': 'Accounting',
     'author': 'TELCO',
     'website': 'live.telco.co.zw',
-    'version': '16.0.1.0.0',
+    'version': '16.0.1.1.0',
     'depends': ['base', 'account', 'contacts', 'product'],
 
     "data": [
         "security/fiscalisation_groups.xml",
         "security/ir.model.access.csv",
         "views/fiscal_device_views.xml",
+        "views/fiscal_day_counter_views.xml",
         "views/account_move_views.xml",
         "reports/report_invoice.xml",
         'data/cron_data.xml',
@@ -26,9 +27,6 @@
         'views/product_view.xml'
     ],
     # only loaded in demonstration mode
-    'external_dependencies': {
-        'python': ['requests', 'qrcode']
-    },
     'demo': [
         'demo/demo.xml',
     ],
@@ -0,0 +1,8 @@
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Fill the company fiscal device, which used to be left empty"""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    companies = env['res.company'].search([('fiscal_device_id', '=', False)])
+    companies._compute_fiscal_device_id()
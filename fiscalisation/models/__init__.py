@@ -1,3 +1,3 @@
 # -*- coding: utf-8 -*-
 
-from . import fiscal_device, account_move, company, res_partner, product
\ No newline at end of file
+from . import fiscal_device, fiscal_day_counter, account_move, company, res_partner, product
\ No newline at end of file
@@ -1,4 +1,5 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from io import BytesIO
 import json
 
 import requests
@@ -7,35 +8,46 @@ from odoo.exceptions import UserError
 import base64
 import logging
 
+try:
+    import qrcode
+except ImportError:
+    qrcode = None
+
 _logger = logging.getLogger(__name__)
 
+RECEIPT_LINE_KEYS = (
+    "receiptLineType",
+    "receiptLineNo",
+    "receiptLineHSCode",
+    "receiptLineName",
+    "receiptLinePrice",
+    "receiptLineQuantity",
+    "receiptLineTotal",
+    "taxPercent",
+)
+
+# Queued invoices fiscalised per cron run, the cron is triggered again for the rest
+FISCALISE_BATCH_SIZE = 50
+
 class AccountMove(models.Model):
     _inherit = 'account.move'
 
-    customer_vat = fields.Char(string='Customer VAT', compute='_compute_customer_vat', store=True)
-    customer_tin = fields.Char(string='Customer TIN', compute='_compute_customer_tin', store=True)
-    receipt_type = fields.Char(string='Receipt Type', compute='_compute_receipt_type')
+    customer_vat = fields.Char(string='Customer VAT', related='partner_id.vat')
+    customer_tin = fields.Char(string='Customer TIN', related='partner_id.tin_number')
+    receipt_type = fields.Char(string='Receipt Type', compute='_compute_receipt_type', store=True)
     qr_url = fields.Char(string='QR Code URL', copy=False)
-    qr_code = fields.Binary(string='QR Code', compute='_compute_qr_code', copy=False)
+    qr_code = fields.Binary(string='QR Code', compute='_compute_qr_code', store=True, copy=False)
     fdms_url = fields.Char(string='FDMS URL', readonly=True, copy=False, compute='_compute_fdms_url')
     fiscal_date = fields.Datetime(string='Fiscalisation Date', copy=False)
-    device_id = fields.Char(string='Device ID', readonly=True, compute='_compute_device_id', store=True)
+    device_id = fields.Char(string='Device ID', readonly=True, compute='_compute_device_id', store=True, index=True)
     device_serial = fields.Char(string='Device Serial', readonly=True, compute='_compute_device_serial', store=True)
     receipt_global_number = fields.Char(string='Receipt Global Number', readonly=True, copy=False)
-    receipt_number = fields.Char(string='Receipt Number', readonly=True, copy=False)
-    fiscal_day_no = fields.Char(string='Fiscal Day', readonly=True, copy=False)
+    receipt_number = fields.Char(string='Receipt Number', readonly=True, copy=False, index=True)
+    fiscal_day_no = fields.Char(string='Fiscal Day', readonly=True, copy=False, index=True)
     verification_code = fields.Char(string='Verification Code', copy=False)
-    fiscalised = fields.Boolean(string='Fiscalised', readonly=True, default=False, copy=False)
-
-    @api.depends('partner_id')
-    def _compute_customer_vat(self):
-        for invoice in self:
-            invoice.customer_vat = invoice.partner_id.vat or ''
-
-    @api.depends('partner_id')
-    def _compute_customer_tin(self):
-        for invoice in self:
-            invoice.customer_tin = invoice.partner_id.tin or ''
+    fiscalised = fields.Boolean(string='Fiscalised', readonly=True, default=False, copy=False, index=True)
+    fiscal_pending = fields.Boolean(string='Fiscalisation Pending', readonly=True, default=False, copy=False)
+    fiscal_requested_by = fields.Many2one('res.users', string='Fiscalisation Requested By', readonly=True, copy=False)
 
     @api.depends('move_type')
     def _compute_receipt_type(self):
@@ -47,30 +59,25 @@ class AccountMove(models.Model):
             else:
                 invoice.receipt_type = 'FiscalInvoice'
 
+    # Only company_id is a dependency on purpose: the device values are a
+    # snapshot taken when the invoice is created and must not change on
+    # already issued invoices when the company's device is edited.
     @api.depends('company_id')
     def _compute_device_id(self):
         for invoice in self:
-            device = self.env['fiscal.device'].search([
-                ('company_id', '=', invoice.company_id.id)
-            ], limit=1)
-            invoice.device_id = device.device_id if device else False
+            invoice.device_id = invoice.company_id.fiscal_device_id.device_id or False
 
     @api.depends('company_id')
     def _compute_device_serial(self):
         for invoice in self:
-            device = self.env['fiscal.device'].search([
-                ('company_id', '=', invoice.company_id.id)
-            ], limit=1)
-            invoice.device_serial = device.device_serial if device else False
+            invoice.device_serial = invoice.company_id.fiscal_device_id.device_serial or False
 
-    @api.depends('company_id')
+    @api.depends('company_id', 'company_id.fiscal_device_id')
     def _compute_fdms_url(self):
         for invoice in self:
-            device = self.env['fiscal.device'].search([
-                ('company_id', '=', invoice.company_id.id)
-            ], limit=1)
-            invoice.fdms_url = device.fdms_url if device else False
+            invoice.fdms_url = invoice.company_id.fiscal_device_id.fdms_url or False
 
+    @api.depends('qr_url', 'verification_code')
     def _compute_qr_code(self):
         for invoice in self:
             if invoice.verification_code:
@@ -79,33 +86,49 @@ class AccountMove(models.Model):
                 invoice.qr_code = False
 
     def _generate_fiscal_invoice_qr_code(self, data):
-        try:
-            import qrcode
-            from io import BytesIO
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(data)
-            qr.make(fit=True)
-            img = qr.make_image(fill_color="black", back_color="white")
-            buffer = BytesIO()
-            img.save(buffer, format="PNG")
-            return base64.b64encode(buffer.getvalue())
-        except ImportError:
+        if qrcode is None:
             _logger.warning("QR code generation requires python-qrcode library")
             return False
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            box_size=4,  # printed at 115px, larger modules only inflate the image
+            border=4,
+        )
+        qr.add_data(data)
+        qr.make(fit=True)
+        img = qr.make_image(fill_color="black", back_color="white")
+        buffer = BytesIO()
+        img.save(buffer, format="PNG")
+        return base64.b64encode(buffer.getvalue())
 
     def action_fiscalise_invoice(self):
+        """Queue the invoice for fiscalisation so the UI does not wait on FDMS"""
+        self.ensure_one()
+        if self.fiscalised:
+            raise UserError(_("This invoice is already fiscalised"))
+        if not self.company_id.fiscal_device_id:
+            raise UserError(_("No fiscal device configured for this company"))
+
+        self._enqueue_fiscalisation()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Fiscalisation Queued'),
+                'message': _('%s will be fiscalised in the background') % self.name,
+                'type': 'info',
+                'sticky': False,
+            }
+        }
+
+    def _fiscalise_invoice(self):
+        """Synchronously fiscalise the invoice, used by tests and shell scripts"""
         self.ensure_one()
         if self.fiscalised:
             raise UserError(_("This invoice is already fiscalised"))
         
-        device = self.env['fiscal.device'].search([
-            ('company_id', '=', self.company_id.id)
-        ], limit=1)
+        device = self.company_id.fiscal_device_id
         
         _logger.info("Initiating fiscalisation for %s (%s)", self.name, self.company_id.name)
         
@@ -114,14 +137,14 @@ class AccountMove(models.Model):
 
         try:
             payload = self._prepare_fiscal_payload()
-            _logger.info("Fiscal payload prepared: %s", payload)
+            _logger.debug("Fiscal payload prepared: %s", payload)
             # raise UserError(_("Fiscal payload prepared: %s", payload))
             
             response = device._api_request('/api/v1/receipts', payload=payload)
-            _logger.info("API response received: %s", response)
+            _logger.debug("API response received: %s", response)
             
-            self._process_fiscal_response(response)
-            return self._show_success_notification(response)
+            vals = self._process_fiscal_response(response)
+            return self._show_success_notification(vals)
             
         except requests.exceptions.HTTPError as e:
             error_code = "UNKNOWN"
@@ -160,21 +183,149 @@ class AccountMove(models.Model):
             _logger.exception("Fiscalisation failed for invoice %s", self.name)
             raise UserError(_("Fiscalisation process failed: %s") % str(e))
     
+    def action_fiscalise_invoices(self):
+        """Queue several invoices for background fiscalisation"""
+        invoices = self.filtered(lambda inv: not inv.fiscalised and inv.state == 'posted')
+        invoices._enqueue_fiscalisation()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Fiscalisation Queued'),
+                'message': _('%s invoice(s) will be fiscalised in the background') % len(invoices),
+                'type': 'info',
+                'sticky': False,
+            }
+        }
+
+    def _enqueue_fiscalisation(self):
+        self.write({
+            'fiscal_pending': True,
+            'fiscal_requested_by': self.env.user.id,
+        })
+        self.env.ref('fiscalisation.ir_cron_fiscalise_pending_invoices')._trigger()
+
+    @api.model
+    def _cron_fiscalise_pending(self, batch_size=FISCALISE_BATCH_SIZE):
+        """Cron job fiscalising the invoices queued from the UI"""
+        invoices = self.search([('fiscal_pending', '=', True)], limit=batch_size + 1)
+        if not invoices:
+            return
+        if len(invoices) > batch_size:
+            invoices = invoices[:batch_size]
+            # Scheduled slightly ahead: triggers due before the end of the
+            # current run are dropped when it finishes
+            self.env.ref('fiscalisation.ir_cron_fiscalise_pending_invoices')._trigger(
+                fields.Datetime.now() + timedelta(minutes=1))
+        # Receipts sent to FDMS cannot be taken back, so the outcome of each
+        # invoice is committed as soon as it is known
+        invoices._fiscalise_batch(auto_commit=True)
+
+    def _fiscalise_batch(self, auto_commit=False):
+        """
+        Fiscalise several invoices, sending the receipts of each device
+        concurrently. Returns the invoices that failed.
+        """
+        invoices = self.filtered(lambda inv: not inv.fiscalised)
+        # Fiscalised from the form while they were queued
+        (self - invoices).filtered('fiscal_pending').fiscal_pending = False
+        failed = self.browse()
+        for company in invoices.company_id:
+            company_invoices = invoices.filtered(lambda inv: inv.company_id == company)
+            device = company.fiscal_device_id
+            if not device:
+                failed |= company_invoices
+                for invoice in company_invoices:
+                    invoice._fiscalisation_done(_("No fiscal device configured for this company"), auto_commit)
+                continue
+
+            _logger.info("Initiating batch fiscalisation of %s invoices for %s", len(company_invoices), company.name)
+
+            to_send = self.browse()
+            payloads = []
+            for invoice in company_invoices:
+                try:
+                    payloads.append(invoice._prepare_fiscal_payload())
+                    to_send |= invoice
+                except Exception as e:
+                    failed |= invoice
+                    invoice._fiscalisation_done(e, auto_commit)
+
+            try:
+                results = device._api_request_batch('/api/v1/receipts', payloads)
+            except UserError as e:
+                failed |= to_send
+                for invoice in to_send:
+                    invoice._fiscalisation_done(e, auto_commit)
+                continue
+
+            for invoice, result in zip(to_send, results):
+                if isinstance(result, Exception):
+                    failed |= invoice
+                    invoice._fiscalisation_done(result, auto_commit)
+                    continue
+                try:
+                    invoice._process_fiscal_response(result)
+                    invoice._fiscalisation_done(auto_commit=auto_commit)
+                except Exception as e:
+                    if not auto_commit:
+                        raise
+                    # The receipt is already registered in FDMS: take the
+                    # invoice out of the queue rather than sending it again
+                    self.env.cr.rollback()
+                    _logger.exception("Storing the fiscal response of invoice %s failed", invoice.name)
+                    failed |= invoice
+                    invoice._fiscalisation_done(e, auto_commit)
+        return failed
+
+    def _fiscalisation_done(self, error=None, auto_commit=False):
+        """Record the outcome of a queued fiscalisation and notify the user who requested it"""
+        self.ensure_one()
+        if error:
+            self._post_fiscal_failure(error)
+        self.fiscal_pending = False
+        if self.fiscal_requested_by:
+            if error:
+                message = _('Fiscalisation of %s failed, see the invoice chatter for details') % self.name
+            else:
+                message = _('%(name)s fiscalised, receipt number %(number)s') % {
+                    'name': self.name,
+                    'number': self.receipt_number,
+                }
+            self.env['bus.bus']._sendone(self.fiscal_requested_by.partner_id, 'simple_notification', {
+                'title': _('Fiscalisation'),
+                'message': message,
+                'type': 'danger' if error else 'success',
+                'sticky': bool(error),
+            })
+        if auto_commit:
+            self.env.cr.commit()
+
+    def _post_fiscal_failure(self, error):
+        self.message_post(
+            body=_("Technical Error: %s") % str(error),
+            subject=_("Fiscalisation Failed"),
+            message_type="comment"
+        )
+        _logger.error("Fiscalisation failed for invoice %s: %s", self.name, error)
+
     def _prepare_fiscal_payload(self):
         
-        lines = self.env['account.move.line'].search([
-            ('move_id', '=', self.id),
-            ('quantity', '>', 0)
+        lines = self._get_fiscal_lines()
+        # Load the partner, product and tax values the payload needs in a
+        # few batched queries instead of one per attribute on a cold cache
+        self.partner_id.read([
+            'name', 'vat', 'tin_number', 'phone', 'email', 'street', 'street2',
+            'city', 'state_id', 'commercial_partner_id',
         ])
+        lines.mapped('product_id').read(['hs_code'])
+        lines.mapped('tax_ids').read(['amount', 'price_include'])
         
         receipt_type = self.receipt_type
+        sign = self._amount_sign(receipt_type)
+        total = float(self.amount_total) * sign
         
-        tax_inclusion_types = set()
-        for line in lines:
-            if not line.tax_ids:
-                continue
-                # raise UserError(_(f"Product {line.product_id.name} has no tax configuration."))
-            tax_inclusion_types.add(line.tax_ids[0].price_include)
+        receipt_lines, tax_inclusion_types = self._build_receipt_lines(lines, sign)
             
         if len(tax_inclusion_types) > 1:
             raise UserError(_("Mixed tax inclusion types detected. All invoice lines must consistently have either tax-inclusive or tax-exclusive prices."))
@@ -183,16 +334,16 @@ class AccountMove(models.Model):
         
         return {
             "receipt": {
-                "receiptType": self.receipt_type,
+                "receiptType": receipt_type,
                 "receiptCurrency": self.currency_id.name,
                 "invoiceNo": self.name,
                 "buyerData": self._prepare_buyer_data(),
                 "receiptNotes": self.ref if self.ref else "",
                 "creditDebitNoteInvoiceNo": self.reversed_entry_id.name if self.move_type in ('out_refund', 'in_refund') else "",
                 "receiptLinesTaxInclusive": receiptLinesTaxInclusive,
-                "receiptLines": self._prepare_receipt_lines(),
-                "receiptPayments": self._prepare_payment_data(),
-                "receiptTotal": self._adjust_amount(self.amount_total, receipt_type),
+                "receiptLines": receipt_lines,
+                "receiptPayments": self._prepare_payment_data(total),
+                "receiptTotal": total,
                 "receiptPrintForm": "InvoiceA4"
             }
         }
@@ -206,8 +357,8 @@ class AccountMove(models.Model):
             buyer_data = {
                 "buyerRegisterName": partner.name,
                 "buyerTradeName": partner.commercial_partner_id.name,
-                "vatNumber": self.customer_vat,
-                "buyerTIN": self.customer_tin,
+                "vatNumber": partner.vat,
+                "buyerTIN": partner.tin_number,
                 "buyerContacts": {
                     "phoneNo": partner.phone or "",
                     "email": partner.email or ""
@@ -225,57 +376,61 @@ class AccountMove(models.Model):
         
         return buyer_data 
 
-    def _prepare_receipt_lines(self):
-        inv_lines = self.env['account.move.line'].search([
-            ('move_id', '=', self.id),
-            ('quantity', '>', 0),
-            ('display_type', 'in', (False, 'product')),  # Only product lines, not section/notes
-            ('product_id', '!=', False)                  # Must have an associated product
-        ])
-        receipt_type = self.receipt_type
-        lines = []
+    def _get_fiscal_lines(self):
+        """Invoice lines reported on the fiscal receipt"""
+        lines = self.invoice_line_ids.filtered(
+            lambda l: l.quantity > 0
+            and l.display_type in (False, 'product')  # Only product lines, not section/notes
+            and l.product_id                          # Must have an associated product
+        )
+        # Warm the cache so per-line tax access does not hit the database
+        lines.mapped('tax_ids')
+        return lines
+
+    def _prepare_receipt_lines(self, inv_lines=None):
+        if inv_lines is None:
+            inv_lines = self._get_fiscal_lines()
+        return self._build_receipt_lines(inv_lines, self._amount_sign(self.receipt_type))[0]
+
+    def _build_receipt_lines(self, inv_lines, sign):
+        """
+        Walk the invoice lines once, returning the receipt lines and the set
+        of tax inclusion types, taken from the first tax of each taxed line
+        """
+        rows = []
+        tax_inclusion_types = set()
         for line in inv_lines:
+            hs_code = line.product_id.hs_code
             # Ensure HS Code is present
-            if not line.product_id.hs_code:
+            if not hs_code:
                 raise UserError(_(f'Product ({line.name}) has no HS Code'))
-            
-            # Always add a non-discounted sale line
-            sale_line_data = {
-                "receiptLineType": "Sale",
-                "receiptLineNo": len(lines) + 1,
-                "receiptLineHSCode": line.product_id.hs_code,
-                "receiptLineName": line.name[:100],
-                "receiptLinePrice": self._adjust_amount(line.price_unit, receipt_type),
-                "receiptLineQuantity": float(line.quantity),
-                "receiptLineTotal": self._adjust_amount(line.price_unit * line.quantity, receipt_type),
-            }
+
+            name = line.name[:100]
+            quantity = float(line.quantity)
+            # Sum tax amounts from all applicable taxes; rows without taxes
+            # are one value short so zip() leaves out taxPercent
+            tax = ()
             if line.tax_ids:
-                # Sum tax amounts from all applicable taxes
-                sale_line_data["taxPercent"] = float(sum(line.tax_ids.mapped("amount")))
-            lines.append(sale_line_data)
+                tax = (float(sum(line.tax_ids.mapped("amount"))),)
+                tax_inclusion_types.add(line.tax_ids[0].price_include)
+
+            # Always add a non-discounted sale line
+            rows.append((
+                "Sale", len(rows) + 1, hs_code, name,
+                float(line.price_unit) * sign, quantity, float(line.price_unit * line.quantity) * sign,
+            ) + tax)
 
-            # If the line has a discount, add a separate discount line
+            # If the line has a discount, add a separate discount line,
+            # including tax information for consistent tax calculations
             if line.discount > 0:
                 discount_amount = line.price_unit * (line.discount / 100.0)
-                discount_total = discount_amount * line.quantity
-                discount_line_data = {
-                    "receiptLineType": "Discount",
-                    "receiptLineNo": len(lines) + 1,
-                    "receiptLineHSCode": line.product_id.hs_code,
-                    "receiptLineName": sale_line_data["receiptLineName"] + " (Discount)",
-                    "receiptLinePrice": -self._adjust_amount(discount_amount, receipt_type),
-                    "receiptLineQuantity": float(line.quantity),
-                    "receiptLineTotal": -self._adjust_amount(discount_total, receipt_type),
-                }
-                
-                # Include tax information for consistent tax calculations
-                if "taxPercent" in sale_line_data:
-                    discount_line_data["taxPercent"] = sale_line_data["taxPercent"]
-                
-                lines.append(discount_line_data)
-        return lines
+                rows.append((
+                    "Discount", len(rows) + 1, hs_code, name + " (Discount)",
+                    -float(discount_amount) * sign, quantity, -float(discount_amount * line.quantity) * sign,
+                ) + tax)
+        return [dict(zip(RECEIPT_LINE_KEYS, row)) for row in rows], tax_inclusion_types
 
-    def _prepare_payment_data(self):
+    def _prepare_payment_data(self, total=None):
         PAYMENT_TYPE_MAPPING = {
             'cash': 'Cash',
             'card': 'Card',
@@ -283,56 +438,52 @@ class AccountMove(models.Model):
             'transfer': 'Transfer'
         }
         
-        receipt_type = self.receipt_type
+        if total is None:
+            total = float(self.amount_total) * self._amount_sign(self.receipt_type)
         payments = []
         payments.append({
             "moneyTypeCode": 'Cash',
-            "paymentAmount": self._adjust_amount(self.amount_total, receipt_type)
+            "paymentAmount": total
         })
         
         return payments
 
     def _process_fiscal_response(self, response):
-        try:
-            receipt_date = response.get('receiptFiscalDate')
-            fiscal_date = fields.Datetime.now()
-            
-            if receipt_date:
-                try:
-                    # Handle ISO format with optional milliseconds
-                    receipt_date = receipt_date.split('.')[0]  # Remove milliseconds if present
-                    dt = datetime.strptime(receipt_date, "%Y-%m-%dT%H:%M:%S")
-                    fiscal_date = fields.Datetime.to_string(dt)
-                except ValueError as e:
-                    _logger.warning("Date format error: %s, using current date", str(e))
-                    
-            self.write({
-                # 'fiscal_signature': response.get('verificationCode'),
-                # 'qr_code': self._generate_qr_code(response.get('qrCodeUrl')),
-                'qr_url': response.get('qrCodeUrl'),
-                'fiscal_date': fiscal_date,
-                'device_id': response.get('deviceID'),
-                'receipt_global_number': response.get('receiptGlobalNo'),
-                'receipt_number': response.get('receiptNumber'),
-                'fiscal_day_no': response.get('fiscalDayNo'),
-                'verification_code': response.get('verificationCode'),
-                'fiscalised': True
-            })
-            
-        except KeyError as e:
-            _logger.error("Missing expected field in API response: %s", str(e))
-            raise UserError(_("Invalid response from fiscal device")) from e
+        """Store the FDMS receipt response and return the written values"""
+        receipt_date = response.get('receiptFiscalDate')
+        fiscal_date = fields.Datetime.now()
+        
+        if receipt_date:
+            try:
+                # Handle ISO format with optional milliseconds or 'Z' (UTC) suffix
+                dt = datetime.fromisoformat(receipt_date[:19])
+                fiscal_date = fields.Datetime.to_string(dt)
+            except ValueError as e:
+                _logger.warning("Date format error: %s, using current date", str(e))
+                
+        vals = {
+            'qr_url': response.get('qrCodeUrl'),
+            'fiscal_date': fiscal_date,
+            'device_id': response.get('deviceID'),
+            'receipt_global_number': response.get('receiptGlobalNo'),
+            'receipt_number': response.get('receiptNumber'),
+            'fiscal_day_no': response.get('fiscalDayNo'),
+            'verification_code': response.get('verificationCode'),
+            'fiscalised': True
+        }
+        self.write(vals)
+        return vals
 
-    def _show_success_notification(self, response):
+    def _show_success_notification(self, vals):
         message = _('''
             Fiscalisation Successful!
             Receipt Number: %(number)s
             Verification Code: %(code)s
             Fiscal Date: %(date)s
         ''') % {
-            'number': response.get('receiptNumber', 'N/A'),
-            'code': response.get('verificationCode', 'N/A'),
-            'date': response.get('receiptFiscalDate', 'N/A')
+            'number': vals['receipt_number'] or 'N/A',
+            'code': vals['verification_code'] or 'N/A',
+            'date': vals['fiscal_date'],
         }
         
         return {
@@ -346,27 +497,29 @@ class AccountMove(models.Model):
                 'next': {'type': 'ir.actions.act_window_close'},
                 'links': [{
                     'label': _('View Receipt'),
-                    'url': response.get('qrCodeUrl', '#'),
+                    'url': vals['qr_url'] or '#',
                     'target': 'new'
                 }]
             }
         }
         
+    @staticmethod
+    def _amount_sign(receipt_type):
+        """Sign to apply to amounts of the given receipt type"""
+        return -1.0 if receipt_type == 'CreditNote' else 1.0
+
     def _adjust_amount(self, amount, receipt_type):
         """Adjust amount sign based on receipt type"""
-        multiplier = -1 if receipt_type.upper() == 'CREDITNOTE' else 1
-        return float(amount) * multiplier
+        return float(amount) * self._amount_sign(receipt_type)
 
     def _calculate_total_with_discounts(self):
         """Calculate total including discounts to avoid invoice validation errors."""
-        total = 0.0
-        for line in self.invoice_line_ids:
-            if 'discount' in line.name.lower() or line.discount > 0:
-                discount_amount = (line.price_unit * line.quantity) * (line.discount / 100.0)
-                total -= discount_amount
-            else:
-                total += line.price_total
-        return total
+        return sum(
+            -(line.price_unit * line.quantity) * (line.discount / 100.0)
+            if line.discount > 0 or 'discount' in (line.name or '').lower()
+            else line.price_total
+            for line in self.invoice_line_ids
+        )
 
 
 
@@ -1,10 +1,21 @@
-from odoo import models, fields
+from odoo import models, fields, api
 
 class ResCompany(models.Model):
     _inherit = 'res.company'
 
+    fiscal_device_ids = fields.One2many('fiscal.device', 'company_id', string='Fiscal Devices')
     fiscal_device_id = fields.Many2one(
         'fiscal.device', 
         string='Fiscal Device',
+        compute='_compute_fiscal_device_id',
+        store=True,
+        readonly=False,
         check_company=True
-    )
\ No newline at end of file
+    )
+
+    @api.depends('fiscal_device_ids')
+    def _compute_fiscal_device_id(self):
+        """Default to the first device of the company, keeping a manual choice"""
+        for company in self:
+            if company.fiscal_device_id not in company.fiscal_device_ids:
+                company.fiscal_device_id = company.fiscal_device_ids[:1]
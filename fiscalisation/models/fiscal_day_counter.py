@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+from odoo.osv import expression
+
+# FDMS fiscalDayCounters keys and the fiscal.day.counter field they map to
+COUNTER_FIELDS = {
+    'fiscalCounterType': 'counter_type',
+    'fiscalCounterCurrency': 'currency',
+    'fiscalCounterTaxID': 'tax_code',
+    'fiscalCounterTaxPercent': 'tax_percent',
+    'fiscalCounterMoneyType': 'money_type',
+    'fiscalCounterValue': 'amount',
+}
+
+
+class FiscalDayCounter(models.Model):
+    _name = 'fiscal.day.counter'
+    _description = 'Fiscal Day Counter'
+    _order = 'device_id, fiscal_day_no desc, counter_type, currency'
+
+    device_id = fields.Many2one('fiscal.device', string='Device', required=True, ondelete='cascade', index=True)
+    company_id = fields.Many2one(related='device_id.company_id', store=True, index=True)
+    fiscal_day_no = fields.Integer(string='Fiscal Day No', required=True, index=True)
+    counter_type = fields.Char(string='Counter Type', index=True)
+    currency = fields.Char(string='Currency')
+    tax_code = fields.Char(string='Tax Code')
+    tax_percent = fields.Float(string='Tax Percent')
+    money_type = fields.Char(string='Money Type')
+    amount = fields.Float(string='Amount')
+
+    @api.model
+    def _replace_counters(self, day_counters):
+        """
+        Replace the stored counters with the FDMS counters lists given as
+        (device id, fiscal day number, counters) tuples, with one search,
+        one unlink and one multi-row INSERT for all of them.
+        """
+        if not day_counters:
+            return self.browse()
+        self.search(expression.OR([
+            [('device_id', '=', device_id), ('fiscal_day_no', '=', fiscal_day_no)]
+            for device_id, fiscal_day_no, _counters in day_counters
+        ])).unlink()
+        rows = []
+        for device_id, fiscal_day_no, counters in day_counters:
+            for counter in counters:
+                row = {field: counter.get(key) for key, field in COUNTER_FIELDS.items()}
+                if row['tax_code'] is not None:
+                    row['tax_code'] = str(row['tax_code'])
+                rows.append(dict(row, device_id=device_id, fiscal_day_no=fiscal_day_no))
+        return self.create(rows)
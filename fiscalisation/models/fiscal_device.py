@@ -1,14 +1,290 @@
-from odoo import models, fields, api, _
+from odoo import models, fields, api, _, _lt
 from odoo.exceptions import UserError
+from odoo.tools import config, ormcache, str2bool
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
 import logging
 import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
-TIMEOUT = 15 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+BATCH_WORKERS = 8
+# FDMS verification site of each production API server, any other server
+# verifies against the FDMS test environment
+FDMS_URLS = {
+    'https://fiscal.telco.co.zw': 'https://fdms.zimra.co.zw',
+}
+FDMS_TEST_URL = 'https://fdmstest.zimra.co.zw'
+# Refresh tokens this long before they expire
+TOKEN_EXPIRY_MARGIN = 60
 
 _logger = logging.getLogger(__name__)
 
+
+def _json_dumps(payload):
+    """Serialise a request body, with orjson when it is installed"""
+    if payload is None:
+        return None
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload)
+
+
+def _json_loads(content):
+    """
+    Decode a response body, with orjson when it is installed. Both raise
+    a json.JSONDecodeError (a ValueError) on invalid input.
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+class _FdmsRetry(Retry):
+    """
+    urllib3 retry policy with full-jitter exponential backoff. A 429 is
+    retried for any method, POST included, since FDMS rejected the request
+    without processing it; Retry-After is honoured when sent.
+    """
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if status_code == 429:
+            return bool(self.total)
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def get_backoff_time(self):
+        return random.uniform(0, super().get_backoff_time())
+
+
+# requests.Session is not thread-safe and must not be shared across forked
+# workers, so each thread lazily builds its own pooled sessions, one per
+# FDMS base URL.
+_session_local = threading.local()
+
+
+def _get_session(base_url):
+    """Return the current thread's pooled keep-alive HTTP session for base_url"""
+    sessions = getattr(_session_local, 'sessions', None)
+    if sessions is None:
+        sessions = _session_local.sessions = {}
+    session = sessions.get(base_url)
+    if session is None:
+        session = requests.Session()
+        session.headers.update({
+            'Content-Type': 'application/json',
+            'User-Agent': 'Odoo-Fiscalisation/1.0',
+        })
+        session.mount('https://', HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            # Read errors and 5xx statuses are only retried for idempotent
+            # methods (urllib3's default), never for POSTs such as receipts
+            max_retries=_FdmsRetry(
+                total=3,
+                connect=3,
+                read=2,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+        ))
+        sessions[base_url] = session
+    return session
+
+
+# Messages of the FDMS 422 validation error codes, translated lazily on use
+_VALIDATION_MESSAGES = {
+    'DEVICE_NOT_FOUND': _lt("Device not registered in FDMS"),
+    'INVALID_OPERATION_STATE': _lt("Device in invalid state for requested operation"),
+    'MISSING_REQUIRED_FIELD': _lt("Required configuration missing in device"),
+    'AUTH_TOKEN_EXPIRED': _lt("Authentication token has expired"),
+}
+
+_FDMS_ERROR_TEMPLATE = _lt(
+    "FDMS Error [%(code)s]\n"
+    "Status: %(status)d\n"
+    "Operation ID: %(operation_id)s\n"
+    "Message: %(message)s"
+)
+
+# Epoch time after which each device's token should be refreshed, keyed
+# by (database, device id). Only an in-process shortcut, the
+# token_expiry_epoch field stays the reference when a key is missing.
+_TOKEN_EXPIRY_CACHE = {}
+
+
+# Optional HTTP/2 transport, enabled with fiscalisation_http2 = True in the
+# server configuration file. A single httpx client per base URL is shared
+# by all threads (httpx clients are thread-safe) and multiplexes the
+# concurrent cron requests over one connection. Servers without HTTP/2
+# support, or setups without httpx[http2], keep using requests.
+try:
+    USE_HTTP2 = httpx is not None and str2bool(config.get('fiscalisation_http2', 'False'))
+except ValueError:
+    _logger.warning("Invalid fiscalisation_http2 value %r, HTTP/2 disabled", config.get('fiscalisation_http2'))
+    USE_HTTP2 = False
+# Retries of a throttled, or failed idempotent, request over HTTP/2
+HTTP2_RETRIES = 3
+HTTP2_RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS', 'TRACE'))
+_http2_clients = {}
+_http2_clients_lock = threading.Lock()
+
+
+def _get_http2_client(base_url):
+    """Shared HTTP/2 client for base_url, None when HTTP/2 is not used"""
+    if not USE_HTTP2:
+        return None
+    client = _http2_clients.get(base_url)
+    if client is None:
+        with _http2_clients_lock:
+            client = _http2_clients.get(base_url)
+            if client is None:
+                try:
+                    client = httpx.Client(
+                        headers={
+                            'Content-Type': 'application/json',
+                            'User-Agent': 'Odoo-Fiscalisation/1.0',
+                        },
+                        timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+                        # The transport owns the pool: httpx ignores the
+                        # client's http2 and limits once a transport is given.
+                        # Its retries only cover connection failures, the
+                        # status retries are done in _httpx_request.
+                        transport=httpx.HTTPTransport(
+                            http2=True,
+                            retries=3,
+                            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+                        ),
+                    )
+                except ImportError:
+                    _logger.warning("HTTP/2 requires the h2 package (httpx[http2]), using requests")
+                    # Remembered so the import is not attempted on every request
+                    client = False
+                _http2_clients[base_url] = client
+    return client or None
+
+
+def _http2_retry_delay(response, attempt):
+    """Seconds to wait before retrying response, Retry-After when FDMS sent one"""
+    retry_after = response.headers.get('Retry-After', '')
+    if retry_after.isdigit():
+        return int(retry_after)
+    # Same full-jitter exponential backoff as _FdmsRetry
+    return random.uniform(0, 0.5 * 2 ** attempt)
+
+
+def _httpx_request(client, method, url, headers, data):
+    """
+    Send a request over httpx, raising the equivalent requests exceptions.
+    Like _FdmsRetry on the requests path, a 429 is retried for any method
+    and 5xx statuses only for idempotent methods, never for POSTs.
+    """
+    for attempt in range(HTTP2_RETRIES + 1):
+        try:
+            response = client.request(method, url, headers=headers, content=data)
+        except httpx.ConnectError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except httpx.HTTPError as e:
+            raise requests.exceptions.RequestException(str(e)) from e
+        status = response.status_code
+        retry = status == 429 or (status in HTTP2_RETRY_STATUSES and method.upper() in IDEMPOTENT_METHODS)
+        if not retry or attempt == HTTP2_RETRIES:
+            return response
+        time.sleep(_http2_retry_delay(response, attempt))
+
+
+def _http_call(base_url, method, url, headers=None, data=None):
+    """
+    Plain HTTP exchange without any ORM access, safe to run in worker
+    threads. Returns the decoded JSON body, or the exception raised.
+    """
+    try:
+        client = _get_http2_client(base_url)
+        if client is not None:
+            response = _httpx_request(client, method, url, headers, data)
+        else:
+            response = _get_session(base_url).request(method, url, headers=headers, data=data, timeout=TIMEOUT)
+    except requests.exceptions.RequestException as e:
+        return e
+    except Exception as e:
+        # Nothing may escape the worker thread (invalid URL, header value
+        # that cannot be encoded...), or the whole batch would be lost
+        error = requests.exceptions.RequestException(str(e))
+        error.__cause__ = e
+        return error
+    if response.status_code >= 400:
+        # Build the HTTPError without raise_for_status, decoding the body
+        # once for every error handler
+        error = requests.exceptions.HTTPError(f"{response.status_code} Error for url: {url}", response=response)
+        try:
+            error.response_data = _json_loads(response.content)
+        except ValueError:
+            error.response_data = None
+        return error
+    try:
+        return _json_loads(response.content)
+    except ValueError as e:
+        return e
+
+
+def _error_response_data(http_error):
+    """Decoded body of an FDMS HTTPError, None when it is not JSON"""
+    if hasattr(http_error, 'response_data'):
+        return http_error.response_data
+    try:
+        return _json_loads(http_error.response.content)
+    except ValueError:
+        return None
+
+
+# Long-lived worker threads, so their thread-local sessions and the
+# keep-alive connections in them are reused by every run. Built lazily
+# and per process: threads do not survive the fork of prefork workers.
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """The process' shared HTTP worker pool"""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix='fiscal_http')
+            _executor_pid = os.getpid()
+    return _executor
+
+
+def _run_concurrently(calls):
+    """Run _http_call argument tuples in the shared thread pool, keeping their order"""
+    if not calls:
+        return []
+    return list(_get_executor().map(lambda call: _http_call(*call), calls))
+
+
 class FiscalDevice(models.Model):
     _name = 'fiscal.device'
     _description = 'Fiscal Device'
@@ -21,15 +297,16 @@ class FiscalDevice(models.Model):
     device_serial = fields.Char(string='Device Serial', required=True, tracking=True)
     activation_key = fields.Char(string='Activation Key', required=True, tracking=True)
     base_url = fields.Char(string='API Base URL', default='https://fiscal-demo.telco.co.zw', required=True, tracking=True)
-    fdms_url = fields.Char(string='API Base URL', compute='_compute_fdms_url', required=True, tracking=True)
+    fdms_url = fields.Char(string='FDMS URL', compute='_compute_fdms_url', store=True, required=True, tracking=True)
     access_token = fields.Char(string='Access Token', copy=False)
     refresh_token = fields.Char(string='Refresh Token', copy=False)
     token_expiry = fields.Datetime(string='Token Expiry')
+    token_expiry_epoch = fields.Integer(string='Token Expiry Epoch', readonly=True, copy=False)
     is_day_open = fields.Boolean(string='Day Open', compute="_compute_is_day_open", store=True, tracking=True)
-    fiscal_day_status = fields.Char(string='Fiscal Day Status', readonly=True)
+    fiscal_day_status = fields.Char(string='Fiscal Day Status', readonly=True, index=True)
     last_receipt_global_no = fields.Integer(string='Last Global Receipt No', readonly=True)
     last_receipt_no = fields.Integer(string='Last Receipt No', readonly=True)
-    fiscal_day_counters = fields.Json(string='Day Counters', readonly=True)
+    fiscal_day_counter_ids = fields.One2many('fiscal.day.counter', 'device_id', string='Fiscal Day Counters', readonly=True)
     fiscal_day_no = fields.Char(string='Fiscal Day No', readonly=True, copy=False)
     last_operation = fields.Datetime(string='Last Operation', readonly=True, copy=False)
     last_status_check = fields.Datetime(string='Last Status Check', readonly=True)
@@ -53,10 +330,7 @@ class FiscalDevice(models.Model):
     def _compute_fdms_url(self):
         """FDMS URL for verification"""
         for record in self:
-            if record.base_url == 'https://fiscal.telco.co.zw':
-                record.fdms_url = 'https://fdms.zimra.co.zw'
-            else:
-                record.fdms_url = 'https://fdmstest.zimra.co.zw'
+            record.fdms_url = FDMS_URLS.get(record.base_url, FDMS_TEST_URL)
     
     def action_manual_token_refresh(self):
         """Manual token refresh with user feedback"""
@@ -88,44 +362,80 @@ class FiscalDevice(models.Model):
     def _refresh_token_if_needed(self):
         """Check and refresh token if expired"""
         self.ensure_one()
-        if not self.token_expiry or datetime.now() > fields.Datetime.from_string(self.token_expiry):
+        if self._token_expired():
             self._get_new_token()
 
+    def _token_expired(self):
+        key = (self.env.cr.dbname, self.id)
+        refresh_at = _TOKEN_EXPIRY_CACHE.get(key)
+        if refresh_at is None:
+            refresh_at = _TOKEN_EXPIRY_CACHE[key] = self.token_expiry_epoch - TOKEN_EXPIRY_MARGIN
+        return time.time() >= refresh_at
+
+    def _expire_cached_token(self):
+        """Force a token refresh on the next API call"""
+        for device in self:
+            _TOKEN_EXPIRY_CACHE[(self.env.cr.dbname, device.id)] = 0
+
+    # _token_call, _store_token, _api_call and _api_result work on a single
+    # device but skip ensure_one(): the crons call them once per device in
+    # loops over already split recordsets.
+
     def _get_new_token(self):
         """Acquire new JWT token from API with better error handling"""
+        self._store_token(_http_call(*self._token_call()))
+
+    def _token_call(self):
+        """_http_call arguments of the token request"""
+        return (
+            self.base_url,
+            'POST',
+            f"{self.base_url}/api/v1/devices/token",
+            None,
+            _json_dumps({"device_serial": self.device_serial, "activation_key": self.activation_key}),
+        )
+
+    def _store_token(self, token_data):
+        """
+        Save the outcome of a token request, raising a UserError on failure.
+        """
         try:
-            response = requests.post(
-                f"{self.base_url}/api/v1/devices/token",
-                json={"device_serial": self.device_serial, "activation_key": self.activation_key},
-                timeout=TIMEOUT
-            )
-            response.raise_for_status()
-            token_data = response.json()
+            if isinstance(token_data, Exception):
+                raise token_data
             
             if not all(k in token_data for k in ('access_token', 'refresh_token', 'expires_in')):
                 raise UserError(_('Invalid API response structure'))
             
+            now = time.time()
             self.write({
                 'access_token': token_data['access_token'],
                 'refresh_token': token_data['refresh_token'],
-                'token_expiry': fields.Datetime.to_string(datetime.now() + timedelta(seconds=token_data['expires_in']))
+                # token_expiry is kept for display
+                'token_expiry': fields.Datetime.to_string(datetime.now() + timedelta(seconds=token_data['expires_in'])),
+                'token_expiry_epoch': int(now) + token_data['expires_in'],
             })
+            # Refresh proactively at 90% of the token lifetime. The entry is
+            # dropped again if the transaction storing the token rolls back,
+            # so the process falls back on the token kept in the database.
+            key = (self.env.cr.dbname, self.id)
+            _TOKEN_EXPIRY_CACHE[key] = now + token_data['expires_in'] * 0.9
+            self.env.cr.postrollback.add(lambda: _TOKEN_EXPIRY_CACHE.pop(key, None))
         except requests.exceptions.ConnectionError as e:
             error_msg = _("Cannot connect to fiscal device server: %s. Connection refused.") % self.base_url
-            self.write({
-                'last_error_code': 'CONNECTION_REFUSED',
-                'last_error_message': error_msg,
-                'last_error_status': 0,
-                'last_status_check': fields.Datetime.now(),
+            self._log_error_details({
+                'code': 'CONNECTION_REFUSED',
+                'message': error_msg,
+                'operation_id': '',
+                'status': 0
             })
             raise UserError(error_msg) from e
         except requests.exceptions.Timeout as e:
-            error_msg = _("Connection timed out after %s seconds when requesting token.") % TIMEOUT
-            self.write({
-                'last_error_code': 'TIMEOUT',
-                'last_error_message': error_msg,
-                'last_error_status': 0,
-                'last_status_check': fields.Datetime.now(),
+            error_msg = _("Connection timed out after %s seconds when requesting token.") % READ_TIMEOUT
+            self._log_error_details({
+                'code': 'TIMEOUT',
+                'message': error_msg,
+                'operation_id': '',
+                'status': 0
             })
             raise UserError(error_msg) from e
         except requests.exceptions.HTTPError as e:
@@ -134,108 +444,173 @@ class FiscalDevice(models.Model):
             raise UserError(self._format_error_message(error_data)) from e
         except Exception as e:
             error_msg = _("Token refresh failed: %s") % str(e)
-            self.write({
-                'last_error_code': 'UNKNOWN_ERROR',
-                'last_error_message': error_msg,
-                'last_error_status': 0,
-                'last_status_check': fields.Datetime.now(),
+            self._log_error_details({
+                'code': 'UNKNOWN_ERROR',
+                'message': error_msg,
+                'operation_id': '',
+                'status': 0
             })
             raise UserError(error_msg) from e
 
+    def _refresh_tokens_concurrently(self):
+        """
+        Refresh the expired tokens of all devices in self with concurrent
+        requests. Returns the UserError of each failed device, by device id.
+        """
+        expired = self.filtered(lambda device: device._token_expired())
+        results = _run_concurrently([device._token_call() for device in expired])
+        errors = {}
+        for device, result in zip(expired, results):
+            try:
+                device._store_token(result)
+            except UserError as e:
+                errors[device.id] = e
+        return errors
+
     def _api_request(self, endpoint, method='POST', payload=None):
         """
         Enhanced API request handler with better connection error handling
         """
         self.ensure_one()
-        
-        try:
-            # Try to refresh token if needed, but handle connection errors here too
+        self._refresh_token_if_needed()
+        _logger.debug("API Request: %s %s", method, endpoint)
+        return self._api_result(_http_call(*self._api_call(endpoint, method, payload)))
+
+    def _api_call(self, endpoint, method='POST', payload=None):
+        """_http_call arguments of an authenticated API request"""
+        return (
+            self.base_url,
+            method,
+            f"{self.base_url}{endpoint}",
+            self._get_auth_headers(),
+            _json_dumps(payload),
+        )
+
+    def _api_result(self, result):
+        """
+        Return the decoded response of an API call, raising a UserError on
+        HTTP failure.
+        """
+        if isinstance(result, requests.exceptions.RequestException):
+            raise self._request_error(result) from result
+        if isinstance(result, ValueError):
+            # Successful status but the body is not JSON (empty, proxy page...)
+            error_data = {
+                'code': 'INVALID_RESPONSE',
+                'message': _("Invalid response from fiscal device server: %s") % str(result),
+                'operation_id': '',
+                'status': 0
+            }
+            self._log_error_details(error_data)
+            raise UserError(error_data['message']) from result
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _api_request_batch(self, endpoint, payloads, method='POST'):
+        """
+        Send several payloads to the same endpoint concurrently.
+        Only the HTTP exchange runs in worker threads, ORM reads and writes
+        stay on the calling thread. Returns the parsed response, or the
+        exception raised for it, for each payload in order.
+        """
+        self.ensure_one()
+        if not payloads:
+            return []
+        self._refresh_token_if_needed()
+        _logger.debug("API Batch Request: %s %s (%s payloads)", method, endpoint, len(payloads))
+        results = _run_concurrently([self._api_call(endpoint, method, payload) for payload in payloads])
+        outcome = []
+        for result in results:
             try:
-                self._refresh_token_if_needed()
-            except requests.exceptions.ConnectionError as conn_err:
-                error_data = {
-                    'code': 'CONNECTION_REFUSED',
-                    'message': _("Cannot connect to fiscal device server: %s") % self.base_url,
-                    'operation_id': '',
-                    'status': 0
-                }
-                self._log_error_details(error_data)
-                raise UserError(error_data['message']) from conn_err
-                
-            _logger.debug("API Request: %s %s", method, endpoint)
-            response = requests.request(
-                method,
-                f"{self.base_url}{endpoint}",
-                headers=self._get_auth_headers(),
-                json=payload,
-                timeout=TIMEOUT
-            )
-            response.raise_for_status()
-            return response.json()
-    
-        except requests.exceptions.HTTPError as e:
-            error_data = self._parse_error_response(e)
-            self._log_error_details(error_data, e.response.json() if e.response else None)
-            raise UserError(self._format_error_message(error_data)) from e
-            
-        except requests.exceptions.ConnectionError as e:
+                outcome.append(self._api_result(result))
+            except Exception as e:
+                outcome.append(e)
+        return outcome
+
+    def _api_request_devices(self, endpoint, method='POST', payload=None):
+        """
+        Call the same endpoint on every device in self concurrently, as the
+        crons do. Returns the parsed response, or the exception raised for
+        it, by device id.
+        """
+        outcome = dict(self._refresh_tokens_concurrently())
+        devices = self.filtered(lambda device: device.id not in outcome)
+        results = _run_concurrently([device._api_call(endpoint, method, payload) for device in devices])
+        for device, result in zip(devices, results):
+            try:
+                outcome[device.id] = device._api_result(result)
+            except Exception as e:
+                outcome[device.id] = e
+        return outcome
+
+    def _request_error(self, exception):
+        """Log a failed HTTP exchange on the device and return the UserError to raise"""
+        if isinstance(exception, requests.exceptions.HTTPError):
+            response_data = _error_response_data(exception)
+            error_data = self._parse_error_response_dict(exception.response.status_code, response_data)
+            self._log_error_details(error_data, response_data)
+            return UserError(self._format_error_message(error_data))
+
+        if isinstance(exception, requests.exceptions.ConnectionError):
             error_data = {
                 'code': 'CONNECTION_REFUSED',
                 'message': _("Connection refused. Please verify the server is running and accessible: %s") % self.base_url,
                 'operation_id': '',
                 'status': 0
             }
-            self._log_error_details(error_data)
-            raise UserError(error_data['message']) from e
-            
-        except requests.exceptions.Timeout as e:
+        elif isinstance(exception, requests.exceptions.Timeout):
             error_data = {
                 'code': 'TIMEOUT',
-                'message': _("Connection timed out after %s seconds. Server might be overloaded.") % TIMEOUT,
+                'message': _("Connection timed out after %s seconds. Server might be overloaded.") % READ_TIMEOUT,
                 'operation_id': '',
                 'status': 0
             }
-            self._log_error_details(error_data)
-            raise UserError(error_data['message']) from e
-            
-        except requests.exceptions.RequestException as e:
+        else:
             error_data = {
                 'code': 'CONNECTION_FAILED',
-                'message': _("Connection error: %s") % str(e),
+                'message': _("Connection error: %s") % str(exception),
                 'operation_id': '',
                 'status': 0
             }
-            self._log_error_details(error_data)
-            raise UserError(error_data['message']) from e
+        self._log_error_details(error_data)
+        return UserError(error_data['message'])
 
     def _parse_error_response(self, http_error):
         """Parse FDMS error response structure"""
+        return self._parse_error_response_dict(http_error.response.status_code, _error_response_data(http_error))
+
+    def _parse_error_response_dict(self, status, response_data):
+        """Parse an already decoded FDMS error body, None when it was not JSON"""
         error_data = {
             'code': 'UNKNOWN',
             'message': _("Unknown error occurred"),
             'operation_id': '',
-            'status': http_error.response.status_code
+            'status': status
         }
 
-        try:
-            response_data = http_error.response.json()
-            # Handle FDMSProblemDetails structure
-            error_data.update({
-                'code': response_data.get('errorCode', response_data.get('type', 'UNKNOWN')),
-                'message': response_data.get('detail', response_data.get('title', error_data['message'])),
-                'operation_id': response_data.get('operationID', ''),
-                'status': response_data.get('status', http_error.response.status_code)
-            })
+        if status == 401:
+            # Token rejected by FDMS: fetch a new one on the next call
+            self._expire_cached_token()
 
-            # Handle validation errors specifically
-            if http_error.response.status_code == 422:
-                error_data['message'] = self._parse_validation_errors(response_data)
-
-        except json.JSONDecodeError:
+        if response_data is None:
             error_data.update({
                 'code': 'INVALID_RESPONSE',
                 'message': _("Server returned non-JSON response")
             })
+            return error_data
+
+        # Handle FDMSProblemDetails structure
+        error_data.update({
+            'code': response_data.get('errorCode', response_data.get('type', 'UNKNOWN')),
+            'message': response_data.get('detail', response_data.get('title', error_data['message'])),
+            'operation_id': response_data.get('operationID', ''),
+            'status': response_data.get('status', status)
+        })
+
+        # Handle validation errors specifically
+        if status == 422:
+            error_data['message'] = self._parse_validation_errors(response_data)
 
         return error_data
 
@@ -246,7 +621,7 @@ class FiscalDevice(models.Model):
         if isinstance(exception, requests.HTTPError):
             status_code = exception.response.status_code
             try:
-                error_details = exception.response.json()
+                error_details = _json_loads(exception.response.content)
                 error_msg += f": HTTP {status_code} - {error_details.get('message', '')}"
             except ValueError:
                 error_msg += f": HTTP {status_code} - {exception.response.text}"
@@ -258,15 +633,9 @@ class FiscalDevice(models.Model):
 
     def _parse_validation_errors(self, response_data):
         """Process 422 validation errors"""
-        error_map = {
-            'DEVICE_NOT_FOUND': _("Device not registered in FDMS"),
-            'INVALID_OPERATION_STATE': _("Device in invalid state for requested operation"),
-            'MISSING_REQUIRED_FIELD': _("Required configuration missing in device"),
-            'AUTH_TOKEN_EXPIRED': _("Authentication token has expired")
-        }
-
+        message = _VALIDATION_MESSAGES.get(response_data.get('errorCode', ''))
         message_parts = [
-            error_map.get(response_data.get('errorCode', ''), _("Validation error occurred")),
+            str(message) if message else _("Validation error occurred"),
             response_data.get('detail', '')
         ]
 
@@ -280,7 +649,15 @@ class FiscalDevice(models.Model):
         return "\n".join(message_parts)
 
     def _log_error_details(self, error_data, response_data=None):
-        """Store error details in model fields"""
+        """
+        Store error details in model fields. Inside crons, where the context
+        carries a fiscal_error_buffer list, the error is only recorded there
+        and written later by _write_buffered_errors.
+        """
+        error_buffer = self.env.context.get('fiscal_error_buffer')
+        if error_buffer is not None:
+            error_buffer.extend((device.id, error_data) for device in self)
+            return
         self.write({
             'last_error_code': error_data['code'],
             'last_error_message': error_data['message'],
@@ -288,25 +665,44 @@ class FiscalDevice(models.Model):
             'last_status_check': fields.Datetime.now(),
         })
 
+    @api.model
+    def _write_buffered_errors(self, error_buffer):
+        """Write buffered errors with one update per distinct error"""
+        by_error = defaultdict(list)
+        for device_id, error_data in error_buffer:
+            by_error[(error_data['code'], error_data['message'], error_data['status'])].append(device_id)
+        now = fields.Datetime.now()
+        for (code, message, status), device_ids in by_error.items():
+            self.browse(device_ids).write({
+                'last_error_code': code,
+                'last_error_message': message,
+                'last_error_status': status,
+                'last_status_check': now,
+            })
+
     def _format_error_message(self, error_data):
         """Generate user-friendly error message"""
-        return _(
-            "FDMS Error [%(code)s]\n"
-            "Status: %(status)d\n"
-            "Operation ID: %(operation_id)s\n"
-            "Message: %(message)s"
-        ) % {
+        template, none_provided = self._error_message_templates(self.env.lang)
+        return template % {
             'code': error_data['code'],
             'status': error_data['status'],
-            'operation_id': error_data['operation_id'] or _('None provided'),
+            'operation_id': error_data['operation_id'] or none_provided,
             'message': error_data['message']
         }
 
+    @ormcache('lang')
+    def _error_message_templates(self, lang):
+        """Translated error message texts, looked up once per language"""
+        return str(_FDMS_ERROR_TEMPLATE), _('None provided')
+
+    def _get_session(self):
+        """Pooled HTTP session for the device's FDMS server"""
+        return _get_session(self.base_url)
+
     def _get_auth_headers(self):
-        return {
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {self.access_token}'
-        }
+        # Content-Type is set on the session; the token stays per request
+        # because devices sharing a base URL share the session
+        return {'Authorization': f'Bearer {self.access_token}'}
 
     # Existing actions with enhanced error handling
     def action_open_day(self):
@@ -385,35 +781,57 @@ class FiscalDevice(models.Model):
     @api.model
     def cron_check_device_status(self):
         """Enhanced cron job with error isolation"""
-        devices = self.search([])
+        error_buffer, counter_buffer = [], []
+        devices = self.search([]).with_context(fiscal_error_buffer=error_buffer, fiscal_counter_buffer=counter_buffer)
+        results = devices._api_request_devices('/api/v1/status', method='POST')
+        partner_ids_by_company = devices._company_partner_ids()
+        # Translated once per run rather than once per failing device
+        body, subject = _("Automatic status check failed: %s"), _("Status Check Error")
         for device in devices:
             try:
-                response = device._api_request('/api/v1/status', method='POST')
+                response = results[device.id]
+                if isinstance(response, Exception):
+                    raise response
                 device._process_status_response(response)
                 _logger.info("Status check succeeded for %s", device.name)
             except Exception as e:
-                _logger.error("Status check failed for %s: %s", device.name, str(e))
+                _logger.error("Status check failed for %s: %s", device.name, e)
                 device.message_post(
-                    body=_("Automatic status check failed: %s") % str(e),
-                    subject=_("Status Check Error"),
-                    partner_ids=device.company_id.user_ids.partner_id.ids
+                    body=body % e,
+                    subject=subject,
+                    partner_ids=partner_ids_by_company[device.company_id.id]
                 )
+        self.env['fiscal.day.counter'].sudo()._replace_counters(counter_buffer)
+        self._write_buffered_errors(error_buffer)
 
     def _cron_refresh_tokens(self):
         """Cron job to refresh tokens for all devices"""
-        devices = self.search([])
+        error_buffer = []
+        devices = self.search([]).with_context(fiscal_error_buffer=error_buffer)
+        errors = devices._refresh_tokens_concurrently()
+        partner_ids_by_company = devices._company_partner_ids()
+        body, subject = _("Automatic token refresh failed: %s"), _("Token Refresh Error")
         for device in devices:
             try:
-                device._refresh_token_if_needed()
+                if device.id in errors:
+                    raise errors[device.id]
                 _logger.info("Token refreshed successfully for %s", device.name)
             except Exception as e:
-                _logger.error("Token refresh failed for %s: %s", device.name, str(e))
+                _logger.error("Token refresh failed for %s: %s", device.name, e)
                 device.message_post(
-                    body=_("Automatic token refresh failed: %s") % str(e),
-                    subject=_("Token Refresh Error"),
-                    partner_ids=device.company_id.user_ids.partner_id.ids
+                    body=body % e,
+                    subject=subject,
+                    partner_ids=partner_ids_by_company[device.company_id.id]
                 )
+        self._write_buffered_errors(error_buffer)
     # Helper methods
+    def _company_partner_ids(self):
+        """Partners of the users of each device company, loaded in one pass for all devices"""
+        return {
+            company.id: company.user_ids.partner_id.ids
+            for company in self.company_id
+        }
+
     def _show_notification(self, title, message, is_error=False):
         return {
             'type': 'ir.actions.client',
@@ -428,14 +846,25 @@ class FiscalDevice(models.Model):
 
     def _process_status_response(self, response):
         """Store status response data"""
-        self.write({
+        counters = response.get('fiscalDayCounters', [])
+        vals = {
             'fiscal_day_status': response.get('fiscalDayStatus'),
             'last_receipt_global_no': response.get('lastReceiptGlobalNo'),
             'last_receipt_no': response.get('lastReceiptNo'),
-            'fiscal_day_counters': response.get('fiscalDayCounters', []),
             'last_status_check': fields.Datetime.now(),
             'fiscal_day_no': response.get('lastFiscalDayNo')
-        })
+        }
+        self.write(vals)
+        # A reply without the key says nothing about the counters, keep them
+        if vals['fiscal_day_no'] and 'fiscalDayCounters' in response:
+            day_counters = [(device.id, int(vals['fiscal_day_no']), counters) for device in self]
+            # Inside cron_check_device_status the counters of all devices
+            # are collected and stored together at the end of the run
+            counter_buffer = self.env.context.get('fiscal_counter_buffer')
+            if counter_buffer is not None:
+                counter_buffer.extend(day_counters)
+            else:
+                self.env['fiscal.day.counter'].sudo()._replace_counters(day_counters)
     
     
     @api.model
@@ -444,22 +873,24 @@ class FiscalDevice(models.Model):
         Cron job to automatically open fiscal day for all devices
         that have closed fiscal days, running between 00:00-00:30 AM
         """
-        current_hour = fields.Datetime.now().hour
-        current_minute = fields.Datetime.now().minute
+        now = fields.Datetime.now()
+        minute_of_day = now.hour * 60 + now.minute
         
         # Only execute between 00:00-00:30 AM
-        if current_hour == 0 and current_minute < 30:
+        if minute_of_day < 30:
             _logger.info("Starting automatic fiscal day opening")
-            devices = self.search([('fiscal_day_status', '=', 'FISCALDAYCLOSED')])
+            error_buffer = []
+            devices = self.search([('fiscal_day_status', '=', 'FISCALDAYCLOSED')]).with_context(fiscal_error_buffer=error_buffer)
+            results = devices._api_request_devices('/api/v1/day/open')
+            # Devices with the same outcome are updated with a single write
+            opened = defaultdict(list)
             
             for device in devices:
                 try:
-                    response = device._api_request('/api/v1/day/open')
-                    device.write({
-                        'fiscal_day_no': str(response['fiscalDayNo']),
-                        'fiscal_day_status': 'FISCALDAYOPENED',
-                        'last_operation': fields.Datetime.now()
-                    })
+                    response = results[device.id]
+                    if isinstance(response, Exception):
+                        raise response
+                    opened[str(response['fiscalDayNo'])].append(device.id)
                     # device.message_post(
                     #     body=_("Fiscal day opened automatically. New fiscal day number: %s") % response['fiscalDayNo'],
                     #     subject=_("Automatic Fiscal Day Open"),
@@ -468,8 +899,7 @@ class FiscalDevice(models.Model):
                     _logger.info("Successfully opened fiscal day for device %s", device.name)
                     
                 except Exception as e:
-                    error_message = str(e)
-                    _logger.error("Failed to automatically open fiscal day for device %s: %s", device.name, error_message)
+                    _logger.error("Failed to automatically open fiscal day for device %s: %s", device.name, e)
                     
                     # device.message_post(
                     #     body=_("Failed to automatically open fiscal day: %s") % error_message,
@@ -478,6 +908,14 @@ class FiscalDevice(models.Model):
                     #     subtype_id=self.env.ref('mail.mt_note').id,
                     #     partner_ids=device.company_id.user_ids.mapped('partner_id').ids
                     # )
+
+            for fiscal_day_no, device_ids in opened.items():
+                self.browse(device_ids).write({
+                    'fiscal_day_no': fiscal_day_no,
+                    'fiscal_day_status': 'FISCALDAYOPENED',
+                    'last_operation': now
+                })
+            self._write_buffered_errors(error_buffer)
     
     @api.model
     def cron_auto_close_fiscal_day(self):
@@ -485,25 +923,30 @@ class FiscalDevice(models.Model):
         Cron job to automatically close fiscal day for all devices
         that have open fiscal days, running between 11:30 PM-12:00 AM
         """
-        current_hour = fields.Datetime.now().hour
-        current_minute = fields.Datetime.now().minute
+        now = fields.Datetime.now()
+        minute_of_day = now.hour * 60 + now.minute
         
-        # Only execute between 11:30 PM and midnight
-        if (current_hour == 23 and current_minute >= 30) or (current_hour == 0 and current_minute == 0):
+        # Only execute between 11:30 PM (minute 1410) and midnight
+        if minute_of_day >= 1410 or minute_of_day == 0:
             _logger.info("Starting automatic fiscal day closing")
-            devices = self.search([('fiscal_day_status', '=', 'FISCALDAYOPENED')])
+            error_buffer = []
+            devices = self.search([('fiscal_day_status', '=', 'FISCALDAYOPENED')]).with_context(fiscal_error_buffer=error_buffer)
+            results = devices._api_request_devices('/api/v1/day/close')
+            # Devices with the same outcome are updated with a single write
+            closed = defaultdict(list)
             
             for device in devices:
                 try:
-                    response = device._api_request('/api/v1/day/close')
+                    response = results[device.id]
+                    if isinstance(response, Exception):
+                        raise response
                     
                     # Process the response data
-                    device.write({
-                        'fiscal_day_status': response.get('fiscalDayStatus'),
-                        'last_receipt_global_no': response.get('lastReceiptGlobalNo'),
-                        'fiscal_day_no': response.get('fiscalDayNo'),
-                        'last_operation': fields.Datetime.now()
-                    })
+                    closed[(
+                        response.get('fiscalDayStatus'),
+                        response.get('lastReceiptGlobalNo'),
+                        response.get('fiscalDayNo'),
+                    )].append(device.id)
                     
                     # Format notification message
                     close_time = response.get('fiscalDayClosed', 'N/A')
@@ -527,8 +970,7 @@ class FiscalDevice(models.Model):
                     _logger.info("Successfully closed fiscal day for device %s", device.name)
                     
                 except Exception as e:
-                    error_message = str(e)
-                    _logger.error("Failed to automatically close fiscal day for device %s: %s", device.name, error_message)
+                    _logger.error("Failed to automatically close fiscal day for device %s: %s", device.name, e)
                     
                     # device.message_post(
                     #     body=_("Failed to automatically close fiscal day: %s") % error_message,
@@ -537,3 +979,12 @@ class FiscalDevice(models.Model):
                     #     subtype_id=self.env.ref('mail.mt_note').id,
                     #     partner_ids=device.company_id.user_ids.mapped('partner_id').ids
                     # )
+
+            for (status, receipt_global_no, fiscal_day_no), device_ids in closed.items():
+                self.browse(device_ids).write({
+                    'fiscal_day_status': status,
+                    'last_receipt_global_no': receipt_global_no,
+                    'fiscal_day_no': fiscal_day_no,
+                    'last_operation': now
+                })
+            self._write_buffered_errors(error_buffer)
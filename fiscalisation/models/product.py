@@ -1,6 +1,14 @@
-from odoo import models, fields
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
 
 class ProductProduct(models.Model):
     _inherit = 'product.template'
 
-    hs_code = fields.Char(string='HS Code', help='Harmonized System Code for the product')
\ No newline at end of file
+    hs_code = fields.Char(string='HS Code', index=True, help='Harmonized System Code for the product (4 to 10 digits)')
+
+    @api.constrains('hs_code')
+    def _check_hs_code(self):
+        for product in self.filtered('hs_code'):
+            # Sent as is to FDMS, so separators are not accepted
+            if not (product.hs_code.isascii() and product.hs_code.isdigit()) or not 4 <= len(product.hs_code) <= 10:
+                raise ValidationError(_("HS Code %s of product %s must be 4 to 10 digits, without separators") % (product.hs_code, product.name))